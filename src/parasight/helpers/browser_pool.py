@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, List, Optional
+
+from playwright.async_api import Browser, Page, Playwright, async_playwright
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VIEWPORT = {"width": 1280, "height": 720}
+
+# The pool the tools should draw pages from. Unset means every tool call launches its own browser.
+current_browser_pool: ContextVar[Optional["BrowserPool"]] = ContextVar("current_browser_pool", default=None)
+
+
+class BrowserPool:
+    """
+    A fixed set of launched Chromium browsers that tool calls borrow pages from.
+
+    Launching Chromium dominates the cost of a short tool call, so a long-lived process (such as a
+    pytest worker) keeps the browsers warm and only opens a fresh, isolated context per call.
+    """
+
+    def __init__(self, size: int = 1, headless: bool = True):
+        """
+        Initialize the browser pool.
+
+        Args:
+            size: Number of browsers to launch
+            headless: Whether the browsers run without a visible window
+        """
+        if size < 1:
+            raise ValueError("BrowserPool size must be at least 1")
+        self.size = size
+        self.headless = headless
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[Browser] = []
+        self._available: Optional[asyncio.Queue] = None
+
+    async def start(self):
+        """
+        Start Playwright and launch all browsers in the pool.
+        """
+        self._playwright = await async_playwright().start()
+        self._available = asyncio.Queue()
+        try:
+            for _ in range(self.size):
+                browser = await self._playwright.chromium.launch(headless=self.headless)
+                self._browsers.append(browser)
+                self._available.put_nowait(browser)
+        except Exception:
+            # Don't leak Playwright or the browsers that did launch
+            await self.close()
+            raise
+        logger.info(f"Started browser pool with {self.size} browser(s)")
+
+    @asynccontextmanager
+    async def new_page(self, viewport: Optional[Dict[str, int]] = None) -> AsyncIterator[Page]:
+        """
+        Borrow a browser and open a page in a fresh context, returning the browser when done.
+
+        Args:
+            viewport: Viewport size for the page (default: 1280x720)
+
+        Yields:
+            A page in a context that is closed on exit
+        """
+        if self._available is None:
+            raise RuntimeError("BrowserPool has not been started")
+        browser = await self._available.get()
+        try:
+            # A relaunch that failed when the browser was last returned is retried here
+            browser = await self._replace_if_disconnected(browser)
+            context = await browser.new_context(viewport=viewport or DEFAULT_VIEWPORT)
+            try:
+                yield await context.new_page()
+            finally:
+                if browser.is_connected():
+                    await context.close()
+        finally:
+            # Never hand a crashed browser to the next caller
+            browser = await self._replace_if_disconnected(browser)
+            self._available.put_nowait(browser)
+
+    async def _replace_if_disconnected(self, browser: Browser) -> Browser:
+        """
+        Return the browser, or a newly launched one in its place if it has crashed or disconnected.
+
+        If the relaunch fails, the disconnected browser is returned so the pool keeps its size and the next
+        borrower tries again.
+        """
+        if browser.is_connected():
+            return browser
+        logger.warning("Browser in pool disconnected, launching a replacement")
+        try:
+            replacement = await self._playwright.chromium.launch(headless=self.headless)
+        except Exception as e:
+            logger.error(f"Failed to launch replacement browser: {str(e)}")
+            return browser
+        self._browsers[self._browsers.index(browser)] = replacement
+        return replacement
+
+    async def close(self):
+        """
+        Close all browsers and stop Playwright.
+        """
+        for browser in self._browsers:
+            await browser.close()
+        self._browsers = []
+        self._available = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+@asynccontextmanager
+async def open_page(headless: bool = True, viewport: Optional[Dict[str, int]] = None) -> AsyncIterator[Page]:
+    """
+    Open a page from the current browser pool, or from a one-off browser when no pool is active.
+
+    Args:
+        headless: Whether a one-off browser runs without a visible window (ignored when pooled)
+        viewport: Viewport size for the page (default: 1280x720)
+
+    Yields:
+        A Playwright page
+    """
+    pool = current_browser_pool.get()
+    if pool is not None:
+        async with pool.new_page(viewport=viewport) as page:
+            yield page
+        return
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        try:
+            yield await browser.new_page(viewport=viewport or DEFAULT_VIEWPORT)
+        finally:
+            await browser.close()
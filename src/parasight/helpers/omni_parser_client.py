@@ -2,7 +2,8 @@ import ast
 import logging
 import os
 import re  # Added re
-from typing import Any, Dict
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
 
 import httpx
 
@@ -10,6 +11,21 @@ import httpx
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+# Used when neither a URL nor $OMNIPARSER_BASE_URL is given
+DEFAULT_OMNIPARSER_URL = "http://192.168.1.28:7860"
+
+# A shared client for the tools to use. Unset means each tool call creates its own client.
+current_omniparser_client: ContextVar[Optional["OmniParserClient"]] = ContextVar(
+    "current_omniparser_client", default=None
+)
+
+
+def default_omniparser_url() -> str:
+    """
+    Return the OmniParser base URL from $OMNIPARSER_BASE_URL, falling back to DEFAULT_OMNIPARSER_URL.
+    """
+    return os.getenv("OMNIPARSER_BASE_URL", DEFAULT_OMNIPARSER_URL)
+
 
 class OmniParserClient:
     """
@@ -0,0 +1,63 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+# The recorder that stage timings are reported to. Unset means timings are not collected.
+current_stage_timings: ContextVar[Optional["StageTimings"]] = ContextVar("current_stage_timings", default=None)
+
+
+class StageTimings:
+    """
+    Accumulates wall-clock time and call counts per named stage of a test run.
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+
+    def add(self, stage: str, seconds: float):
+        """
+        Record one occurrence of a stage.
+
+        Args:
+            stage: Name of the stage (e.g., "screenshot")
+            seconds: Wall-clock duration of the occurrence
+        """
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return the timings as a plain, serializable dictionary.
+        """
+        return {stage: {"seconds": round(self.seconds[stage], 3), "calls": self.calls[stage]} for stage in self.seconds}
+
+    def format(self) -> str:
+        """
+        Return the timings as an aligned text table, slowest stage first.
+        """
+        if not self.seconds:
+            return "no stages recorded"
+        width = max(len(stage) for stage in self.seconds)
+        lines = []
+        for stage, seconds in sorted(self.seconds.items(), key=lambda item: item[1], reverse=True):
+            lines.append(f"{stage:<{width}}  {seconds:8.3f}s  ({self.calls[stage]} call(s))")
+        return "\n".join(lines)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """
+    Time the enclosed block and add it to the current StageTimings, if one is active.
+
+    Args:
+        stage: Name of the stage being timed
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = current_stage_timings.get()
+        if timings is not None:
+            timings.add(stage, time.perf_counter() - start)
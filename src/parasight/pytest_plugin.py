@@ -0,0 +1,403 @@
+"""
+Pytest plugin that runs Parasight scenarios as test items. It is not loaded automatically; enable it with
+``-p parasight.pytest_plugin`` or ``pytest_plugins = ["parasight.pytest_plugin"]`` in the top-level conftest.py.
+
+Scenario files are JSON files named ``*.parasight.json`` holding one scenario object, or a list of them:
+
+    {"name": "login", "prompt": "Test the login flow for ...", "expected": "PASS"}
+
+Each pytest process (the main process, or every pytest-xdist worker when run with ``-n``) owns one event loop,
+a warm BrowserPool and one OmniParserClient, shared by all scenarios it runs. Scenarios are ordered longest first
+by their recorded durations, and ``--parasight-shard-count``/``--parasight-shard-index`` split them across
+machines so that each shard gets a similar total run time.
+
+Shard membership is computed from the durations file, so every shard must read the same file. Sharded runs never
+rewrite it: each shard writes its measurements to its own ``<durations>.shard<N>.json`` file, and
+``parasight-merge-durations`` folds those back into the shared file once all shards have finished.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import pytest
+
+from parasight.helpers.browser_pool import BrowserPool, current_browser_pool
+from parasight.helpers.omni_parser_client import (
+    DEFAULT_OMNIPARSER_URL,
+    OmniParserClient,
+    current_omniparser_client,
+    default_omniparser_url,
+)
+from parasight.helpers.stage_timer import StageTimings, current_stage_timings, stage_timer
+
+SCENARIO_SUFFIX = ".parasight.json"
+STAGE_TIMINGS_PROPERTY = "parasight_stage_timings"
+# Only set once the agent has produced an answer, so crashed runs never overwrite recorded durations
+AGENT_FINISHED_PROPERTY = "parasight_agent_finished"
+# Used for scenarios without a recorded duration when nothing at all has been recorded yet
+DEFAULT_SCENARIO_SECONDS = 60.0
+
+worker_resources_key = pytest.StashKey["WorkerResources"]()
+
+
+class ScenarioFailure(Exception):
+    """
+    Raised when the agent's final answer does not match the scenario's expected answer.
+    """
+
+
+class WorkerResources:
+    """
+    The event loop, browser pool and OmniParser client owned by one pytest process.
+    """
+
+    def __init__(self, browsers: int, omniparser_url: str):
+        """
+        Initialize the worker resources. Nothing is started until the first scenario is set up.
+
+        Args:
+            browsers: Number of browsers in the pool
+            omniparser_url: Base URL for the OmniParser API
+        """
+        self.loop = asyncio.new_event_loop()
+        self.browser_pool = BrowserPool(size=browsers, headless=True)
+        self.omniparser_client: Optional[OmniParserClient] = None
+        self.omniparser_url = omniparser_url
+        self.started = False
+        self.start_error: Optional[BaseException] = None
+
+    def run(self, coroutine):
+        """
+        Run a coroutine to completion on this worker's event loop.
+        """
+        return self.loop.run_until_complete(coroutine)
+
+    async def start(self):
+        """
+        Launch the browsers and create the OmniParser client.
+
+        A failure is remembered, so that later scenarios fail immediately instead of retrying the launch.
+        """
+        try:
+            await self.browser_pool.start()
+            self.omniparser_client = OmniParserClient(base_url=self.omniparser_url)
+        except Exception as e:
+            self.start_error = e
+            await self.close()
+            raise
+        self.started = True
+
+    async def close(self):
+        """
+        Close the browsers and the OmniParser client.
+        """
+        if self.omniparser_client is not None:
+            await self.omniparser_client.close()
+        await self.browser_pool.close()
+        self.started = False
+
+
+class DurationRecorder:
+    """
+    Records scenario durations from test reports and saves them for the next run's ordering and sharding.
+
+    Registered only in the controlling process: xdist workers forward their reports to it. Sharded runs pass a
+    per-shard path, so that the durations file every shard reads stays identical until the shards are merged.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.measured: Dict[str, float] = {}
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport):
+        # A run where the agent crashed (OpenAI error, OmniParser down, ...) says nothing about the scenario's
+        # real duration, so only runs that reached an answer are recorded, whether it matched or not
+        if report.when == "call" and dict(report.user_properties).get(AGENT_FINISHED_PROPERTY):
+            self.measured[report.nodeid] = report.duration
+
+    def pytest_sessionfinish(self):
+        if not self.measured:
+            return
+        durations = _load_durations(self.path)
+        durations.update({nodeid: round(seconds, 3) for nodeid, seconds in self.measured.items()})
+        self.path.write_text(json.dumps(durations, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+class ScenarioFile(pytest.File):
+    """
+    A ``*.parasight.json`` file containing one or more scenarios.
+    """
+
+    def collect(self) -> Iterator["ScenarioItem"]:
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        scenarios = data if isinstance(data, list) else [data]
+        for index, scenario in enumerate(scenarios):
+            if not isinstance(scenario, dict) or not scenario.get("prompt"):
+                raise self.CollectError(f"Scenario {index} in {self.path} must be an object with a 'prompt'")
+            name = scenario.get("name") or f"scenario_{index}"
+            yield ScenarioItem.from_parent(
+                self, name=name, prompt=scenario["prompt"], expected=scenario.get("expected", "PASS")
+            )
+
+
+class ScenarioItem(pytest.Item):
+    """
+    A single scenario run by the UI test agent.
+    """
+
+    def __init__(self, *, prompt: str, expected: str, **kwargs):
+        super().__init__(**kwargs)
+        self.prompt = prompt
+        self.expected = expected
+
+    def setup(self):
+        # Start the worker's browsers here rather than in runtest, so startup time never reaches the call
+        # report's duration, which is what ordering and sharding are based on
+        resources = _worker_resources(self.config)
+        if resources.start_error is not None:
+            raise RuntimeError("Parasight worker resources failed to start") from resources.start_error
+        if not resources.started:
+            resources.run(resources.start())
+
+    def runtest(self):
+        resources = self.config.stash[worker_resources_key]
+        artifacts_dir = _artifacts_dir(self.config) / _safe_name(self.nodeid)
+        artifacts_dir.mkdir(parents=True, exist_ok=True)
+
+        timings = StageTimings()
+        # The tools write screenshots relative to the working directory, so give each scenario its own
+        cwd = os.getcwd()
+        os.chdir(artifacts_dir)
+        try:
+            final_output = resources.run(self._run_agent(resources, timings))
+            self.user_properties.append((AGENT_FINISHED_PROPERTY, True))
+        finally:
+            os.chdir(cwd)
+            self.user_properties.append((STAGE_TIMINGS_PROPERTY, timings.as_dict()))
+            self.add_report_section("call", "parasight stage timings", timings.format())
+
+        answer = str(final_output).strip()
+        if answer != self.expected:
+            raise ScenarioFailure(f"Expected {self.expected!r}, agent answered {answer!r}")
+
+    async def _run_agent(self, resources: WorkerResources, timings: StageTimings) -> Any:
+        # Imported here because parasight.main requires OPENAI_API_KEY at import time
+        from agents import Runner, trace
+
+        from parasight.main import agent
+
+        current_browser_pool.set(resources.browser_pool)
+        current_omniparser_client.set(resources.omniparser_client)
+        current_stage_timings.set(timings)
+        # "total" includes the tool stages recorded while the agent runs
+        with trace(f"Parasight scenario {self.name}"), stage_timer("total"):
+            result = await Runner.run(agent, self.prompt)
+        return result.final_output
+
+    def repr_failure(self, excinfo):
+        if isinstance(excinfo.value, ScenarioFailure):
+            return f"{self.name}: {excinfo.value}"
+        return super().repr_failure(excinfo)
+
+    def reportinfo(self):
+        return self.path, None, f"parasight scenario: {self.name}"
+
+
+def _worker_resources(config: pytest.Config) -> WorkerResources:
+    # Created on first use, so sessions without scenarios never create an event loop
+    if worker_resources_key not in config.stash:
+        config.stash[worker_resources_key] = WorkerResources(
+            browsers=config.getoption("parasight_browsers"),
+            omniparser_url=config.getoption("parasight_omniparser_url"),
+        )
+    return config.stash[worker_resources_key]
+
+
+def _safe_name(nodeid: str) -> str:
+    return "".join(char if char.isalnum() or char in "-_." else "_" for char in nodeid)
+
+
+def _artifacts_dir(config: pytest.Config) -> Path:
+    return config.rootpath / config.getoption("parasight_artifacts")
+
+
+def _durations_path(config: pytest.Config) -> Path:
+    return config.rootpath / config.getoption("parasight_durations")
+
+
+def _shard_durations_path(path: Path, shard_index: int) -> Path:
+    return path.with_name(f"{path.stem}.shard{shard_index}{path.suffix}")
+
+
+def _load_durations(path: Path) -> Dict[str, float]:
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    durations = {}
+    for nodeid, seconds in data.items():
+        # Skip entries that are not a number instead of discarding the whole file
+        if isinstance(seconds, (int, float)) and not isinstance(seconds, bool):
+            durations[nodeid] = float(seconds)
+    return durations
+
+
+def assign_shards(durations: Dict[str, float], shard_count: int) -> Dict[str, int]:
+    """
+    Assign test ids to shards so that the shards' total durations are as even as possible.
+
+    Uses the longest-processing-time-first greedy rule: each test, longest first, goes to the shard with the
+    least total duration so far. Ties are broken by test id and shard index, so every machine computes the
+    same assignment from the same durations.
+
+    Args:
+        durations: Expected duration in seconds per test id
+        shard_count: Number of shards
+
+    Returns:
+        The shard index for each test id
+    """
+    loads = [0.0] * shard_count
+    assignment = {}
+    for nodeid, seconds in sorted(durations.items(), key=lambda item: (-item[1], item[0])):
+        shard = min(range(shard_count), key=lambda index: (loads[index], index))
+        assignment[nodeid] = shard
+        loads[shard] += seconds
+    return assignment
+
+
+def merge_durations(durations_path: Path, shard_paths: List[Path]) -> Dict[str, float]:
+    """
+    Merge per-shard durations files into the shared durations file.
+
+    Args:
+        durations_path: The shared durations file, updated in place
+        shard_paths: Durations files written by sharded runs
+
+    Returns:
+        The merged durations
+    """
+    durations = _load_durations(durations_path)
+    for shard_path in shard_paths:
+        durations.update(_load_durations(shard_path))
+    durations_path.write_text(json.dumps(durations, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return durations
+
+
+def merge_durations_main():
+    parser = argparse.ArgumentParser(description="Merge per-shard Parasight durations files into the shared file.")
+    parser.add_argument("shard_files", nargs="+", type=Path, help="Files written by sharded runs")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path(".parasight_durations.json"),
+        help="Shared durations file to update (default: %(default)s)",
+    )
+    args = parser.parse_args()
+    durations = merge_durations(args.output, args.shard_files)
+    print(f"Merged {len(args.shard_files)} shard file(s) into {args.output} ({len(durations)} scenarios)")
+
+
+def pytest_addoption(parser: pytest.Parser):
+    group = parser.getgroup("parasight", "Parasight UI scenarios")
+    group.addoption(
+        "--parasight-browsers",
+        type=int,
+        default=1,
+        help="Number of warm browsers per pytest process (default: 1)",
+    )
+    group.addoption(
+        "--parasight-omniparser-url",
+        default=default_omniparser_url(),
+        help=f"Base URL for the OmniParser API (default: $OMNIPARSER_BASE_URL or {DEFAULT_OMNIPARSER_URL})",
+    )
+    group.addoption(
+        "--parasight-shard-count",
+        type=int,
+        default=1,
+        help="Split the scenarios into this many duration-balanced shards (default: 1)",
+    )
+    group.addoption(
+        "--parasight-shard-index",
+        type=int,
+        default=0,
+        help="Zero-based index of the shard to run (default: 0)",
+    )
+    group.addoption(
+        "--parasight-durations",
+        default=".parasight_durations.json",
+        help="Scenario durations file, relative to the rootdir (default: %(default)s)",
+    )
+    group.addoption(
+        "--parasight-artifacts",
+        default="parasight-artifacts",
+        help="Directory for scenario screenshots, relative to the rootdir (default: %(default)s)",
+    )
+
+
+def pytest_configure(config: pytest.Config):
+    shard_count = config.getoption("parasight_shard_count")
+    shard_index = config.getoption("parasight_shard_index")
+    if shard_count < 1:
+        raise pytest.UsageError("--parasight-shard-count must be at least 1")
+    if not 0 <= shard_index < shard_count:
+        raise pytest.UsageError("--parasight-shard-index must be between 0 and --parasight-shard-count - 1")
+    if config.getoption("parasight_browsers") < 1:
+        raise pytest.UsageError("--parasight-browsers must be at least 1")
+
+    if not hasattr(config, "workerinput"):
+        durations_path = _durations_path(config)
+        if shard_count > 1:
+            durations_path = _shard_durations_path(durations_path, shard_index)
+        config.pluginmanager.register(DurationRecorder(durations_path), "parasight-durations")
+
+
+def pytest_collect_file(parent: pytest.Collector, file_path: Path) -> Optional[ScenarioFile]:
+    if file_path.name.endswith(SCENARIO_SUFFIX):
+        return ScenarioFile.from_parent(parent, path=file_path)
+    return None
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: List[pytest.Item]):
+    scenarios = [item for item in items if isinstance(item, ScenarioItem)]
+    if not scenarios:
+        return
+
+    recorded = _load_durations(_durations_path(config))
+    known = sorted(recorded[item.nodeid] for item in scenarios if item.nodeid in recorded)
+    fallback = known[len(known) // 2] if known else DEFAULT_SCENARIO_SECONDS
+    durations = {item.nodeid: recorded.get(item.nodeid, fallback) for item in scenarios}
+
+    shard_count = config.getoption("parasight_shard_count")
+    if shard_count > 1:
+        shard_index = config.getoption("parasight_shard_index")
+        assignment = assign_shards(durations, shard_count)
+        deselected = [item for item in scenarios if assignment[item.nodeid] != shard_index]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            skipped = {id(item) for item in deselected}
+            items[:] = [item for item in items if id(item) not in skipped]
+
+    # Longest scenarios first, so that pytest-xdist's load scheduling does not end on a long straggler.
+    # The sort is stable and deterministic, so all xdist workers agree on the collection order.
+    others = [item for item in items if not isinstance(item, ScenarioItem)]
+    ordered = sorted(
+        (item for item in items if isinstance(item, ScenarioItem)), key=lambda item: -durations[item.nodeid]
+    )
+    items[:] = ordered + others
+
+
+def pytest_sessionfinish(session: pytest.Session):
+    resources = session.config.stash.get(worker_resources_key, None)
+    if resources is not None:
+        if resources.started:
+            resources.run(resources.close())
+        resources.loop.close()
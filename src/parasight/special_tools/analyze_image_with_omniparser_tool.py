@@ -8,7 +8,12 @@ from typing import (
 
 from agents import function_tool
 
-from parasight.helpers.omni_parser_client import OmniParserClient
+from parasight.helpers.omni_parser_client import (
+    OmniParserClient,
+    current_omniparser_client,
+    default_omniparser_url,
+)
+from parasight.helpers.stage_timer import stage_timer
 
 
 # Core logic function (without decorator)
@@ -39,12 +44,16 @@ async def _analyze_image_with_omniparser_core(
             image_data = f.read()
         print(f"Successfully loaded image data, size: {len(image_data)} bytes")
 
-        print("Connecting to OmniParser at http://192.168.1.28:7860")
-        omniparser_client = OmniParserClient(base_url="http://192.168.1.28:7860")
+        omniparser_client = current_omniparser_client.get()
+        if omniparser_client is None:
+            base_url = default_omniparser_url()
+            print(f"Connecting to OmniParser at {base_url}")
+            omniparser_client = OmniParserClient(base_url=base_url)
         print(f"Sending image to OmniParser with box_threshold={box_threshold}, iou_threshold={iou_threshold}")
-        result = await omniparser_client.process_image(
-            image_data=image_data, box_threshold=box_threshold, iou_threshold=iou_threshold
-        )
+        with stage_timer("omniparser"):
+            result = await omniparser_client.process_image(
+                image_data=image_data, box_threshold=box_threshold, iou_threshold=iou_threshold
+            )
         print(f"Received response from OmniParser: {result}")
 
         # Check if the response is successful (no 'success' key means success, 'success': False means error)
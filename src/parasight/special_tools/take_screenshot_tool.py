@@ -2,9 +2,11 @@ import os
 from typing import Optional
 
 from agents import function_tool
-from playwright.async_api import async_playwright
 from pydantic import BaseModel  # Import BaseModel
 
+from parasight.helpers.browser_pool import open_page
+from parasight.helpers.stage_timer import stage_timer
+
 
 # --- Pydantic Model for take_screenshot output ---
 class ScreenshotResultOutput(BaseModel):
@@ -33,30 +35,25 @@ async def _take_screenshot_core(
     Returns:
         Pydantic model instance with screenshot results and metadata
     """
-    async with async_playwright() as p:
-        # Select browser based on type
-        browser = await p.chromium.launch(headless=True)
+    with stage_timer("screenshot"):
         # Create page with specified viewport
-        page = await browser.new_page(viewport={"width": 1280, "height": 720})
-
-        try:
-            # Navigate to URL
-            await page.goto(url, wait_until="networkidle", timeout=30000)
-
-            # Wait additional time if specified
-            if wait_time > 0:
-                await page.wait_for_timeout(wait_time)
-
-            # Save screenshot to file
-            await page.screenshot(path=output_file, full_page=True)
-            # Return Pydantic model instance
-            return ScreenshotResultOutput(success=True, file_path=os.path.abspath(output_file), url=url)
-
-        except Exception as e:
-            # Return Pydantic model instance on error
-            return ScreenshotResultOutput(success=False, error=str(e), url=url, file_path=output_file)
-        finally:
-            await browser.close()
+        async with open_page(headless=True, viewport={"width": 1280, "height": 720}) as page:
+            try:
+                # Navigate to URL
+                await page.goto(url, wait_until="networkidle", timeout=30000)
+
+                # Wait additional time if specified
+                if wait_time > 0:
+                    await page.wait_for_timeout(wait_time)
+
+                # Save screenshot to file
+                await page.screenshot(path=output_file, full_page=True)
+                # Return Pydantic model instance
+                return ScreenshotResultOutput(success=True, file_path=os.path.abspath(output_file), url=url)
+
+            except Exception as e:
+                # Return Pydantic model instance on error
+                return ScreenshotResultOutput(success=False, error=str(e), url=url, file_path=output_file)
 
 
 # Apply the function_tool decorator to the core logic function
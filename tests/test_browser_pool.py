@@ -0,0 +1,118 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from parasight.helpers.browser_pool import BrowserPool
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    async def new_page(self):
+        return SimpleNamespace(context=self)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self, name):
+        self.name = name
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, viewport):
+        if not self.connected:
+            raise RuntimeError(f"{self.name} has been closed")
+        return FakeContext(self)
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeChromium:
+    def __init__(self):
+        self.launched = []
+        self.fail_launch = False
+
+    async def launch(self, headless):
+        if self.fail_launch:
+            raise RuntimeError("Chromium failed to launch")
+        browser = FakeBrowser(f"browser_{len(self.launched)}")
+        self.launched.append(browser)
+        return browser
+
+
+def started_pool(size=1):
+    pool = BrowserPool(size=size)
+    chromium = FakeChromium()
+    pool._playwright = SimpleNamespace(chromium=chromium)
+    pool._available = asyncio.Queue()
+    for _ in range(size):
+        browser = asyncio.run(chromium.launch(headless=True))
+        pool._browsers.append(browser)
+        pool._available.put_nowait(browser)
+    return pool, chromium
+
+
+async def use_page(pool, crash=False):
+    async with pool.new_page() as page:
+        if crash:
+            page.context.browser.connected = False
+        return page
+
+
+def test_new_page_returns_browser_to_pool():
+    pool, chromium = started_pool()
+
+    async def scenario():
+        first = await use_page(pool)
+        second = await use_page(pool)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first.context.closed
+    assert first.context.browser is second.context.browser
+    assert len(chromium.launched) == 1
+
+
+def test_crashed_browser_is_replaced():
+    pool, chromium = started_pool()
+
+    async def scenario():
+        crashed = await use_page(pool, crash=True)
+        # Replaced as soon as it is returned, not only when it is next borrowed
+        assert pool._browsers[0].is_connected()
+        after = await use_page(pool)
+        return crashed, after
+
+    crashed, after = asyncio.run(scenario())
+
+    assert after.context.browser is not crashed.context.browser
+    assert after.context.browser.is_connected()
+    assert pool._browsers == [after.context.browser]
+    assert len(chromium.launched) == 2
+
+
+def test_failed_relaunch_is_retried_on_next_borrow():
+    pool, chromium = started_pool()
+
+    async def scenario():
+        chromium.fail_launch = True
+        await use_page(pool, crash=True)
+        with pytest.raises(RuntimeError, match="has been closed"):
+            await use_page(pool)
+        chromium.fail_launch = False
+        return await use_page(pool)
+
+    after = asyncio.run(scenario())
+
+    assert after.context.browser.is_connected()
+    assert pool._browsers == [after.context.browser]
+    assert pool._available.qsize() == 1
@@ -0,0 +1,353 @@
+import json
+import random
+from types import SimpleNamespace
+from xml.etree import ElementTree
+
+import pytest
+
+from parasight.pytest_plugin import (
+    AGENT_FINISHED_PROPERTY,
+    STAGE_TIMINGS_PROPERTY,
+    DurationRecorder,
+    _load_durations,
+    _shard_durations_path,
+    assign_shards,
+    merge_durations,
+)
+
+PLUGIN = ("-p", "parasight.pytest_plugin")
+
+SCENARIOS = {
+    "a": 50,
+    "b": 40,
+    "c": 30,
+    "d": 20,
+    "e": 10,
+}
+
+
+@pytest.fixture
+def scenario_project(pytester):
+    pytester.makefile(
+        ".parasight.json",
+        suite=json.dumps([{"name": name, "prompt": f"Run scenario {name}"} for name in SCENARIOS]),
+    )
+    durations = {f"suite.parasight.json::{name}": seconds for name, seconds in SCENARIOS.items()}
+    (pytester.path / ".parasight_durations.json").write_text(json.dumps(durations))
+    return pytester
+
+
+def collected_names(result):
+    return [line.split("::")[1] for line in result.outlines if "::" in line]
+
+
+# --- assign_shards ---
+
+
+def test_assign_shards_balances_total_duration():
+    assignment = assign_shards(SCENARIOS, 2)
+
+    loads = [sum(seconds for name, seconds in SCENARIOS.items() if assignment[name] == shard) for shard in range(2)]
+    assert sorted(loads) == [70, 80]
+
+
+def test_assign_shards_assigns_every_test_exactly_once():
+    durations = {f"test_{index}": float(index % 7) for index in range(50)}
+
+    assignment = assign_shards(durations, 4)
+
+    assert set(assignment) == set(durations)
+    assert set(assignment.values()) == {0, 1, 2, 3}
+
+
+def test_assign_shards_is_independent_of_input_order():
+    durations = {f"test_{index}": float(index % 5) for index in range(30)}
+    shuffled = list(durations.items())
+    random.Random(0).shuffle(shuffled)
+
+    assert assign_shards(durations, 3) == assign_shards(dict(shuffled), 3)
+
+
+def test_assign_shards_with_one_shard():
+    assert set(assign_shards(SCENARIOS, 1).values()) == {0}
+
+
+# --- durations files ---
+
+
+def test_load_durations_missing_file(tmp_path):
+    assert _load_durations(tmp_path / "missing.json") == {}
+
+
+@pytest.mark.parametrize("content", ["not json", "[1, 2]", '"text"'])
+def test_load_durations_ignores_malformed_file(tmp_path, content):
+    path = tmp_path / "durations.json"
+    path.write_text(content)
+
+    assert _load_durations(path) == {}
+
+
+def test_load_durations_skips_invalid_entries(tmp_path):
+    path = tmp_path / "durations.json"
+    path.write_text(json.dumps({"a": 1.5, "b": None, "c": "slow", "d": True, "e": 3}))
+
+    assert _load_durations(path) == {"a": 1.5, "e": 3.0}
+
+
+def test_shard_durations_path(tmp_path):
+    path = tmp_path / ".parasight_durations.json"
+
+    assert _shard_durations_path(path, 2) == tmp_path / ".parasight_durations.shard2.json"
+
+
+def test_merge_durations_updates_shared_file(tmp_path):
+    shared = tmp_path / ".parasight_durations.json"
+    shared.write_text(json.dumps({"a": 50, "b": 40, "c": 30}))
+    shard0 = tmp_path / ".parasight_durations.shard0.json"
+    shard0.write_text(json.dumps({"a": 55}))
+    shard1 = tmp_path / ".parasight_durations.shard1.json"
+    shard1.write_text(json.dumps({"c": 25, "d": 5}))
+
+    merged = merge_durations(shared, [shard0, shard1])
+
+    assert merged == {"a": 55, "b": 40, "c": 25, "d": 5}
+    assert json.loads(shared.read_text()) == merged
+
+
+def _report(nodeid, when, user_properties):
+    return SimpleNamespace(nodeid=nodeid, when=when, duration=2.0, user_properties=user_properties)
+
+
+FINISHED = [(AGENT_FINISHED_PROPERTY, True), (STAGE_TIMINGS_PROPERTY, {})]
+
+
+def test_duration_recorder_saves_finished_scenario_call_durations_only(tmp_path):
+    path = tmp_path / "durations.json"
+    path.write_text(json.dumps({"old": 1.0}))
+    recorder = DurationRecorder(path)
+
+    recorder.pytest_runtest_logreport(_report("scenario", "call", FINISHED))
+    recorder.pytest_runtest_logreport(_report("scenario", "setup", FINISHED))
+    recorder.pytest_runtest_logreport(_report("test_unit", "call", []))
+    recorder.pytest_sessionfinish()
+
+    assert json.loads(path.read_text()) == {"old": 1.0, "scenario": 2.0}
+
+
+def test_duration_recorder_ignores_scenarios_whose_agent_crashed(tmp_path):
+    path = tmp_path / "durations.json"
+    path.write_text(json.dumps({"scenario": 300.0}))
+    recorder = DurationRecorder(path)
+
+    recorder.pytest_runtest_logreport(_report("scenario", "call", [(STAGE_TIMINGS_PROPERTY, {})]))
+    recorder.pytest_sessionfinish()
+
+    assert json.loads(path.read_text()) == {"scenario": 300.0}
+
+
+# --- collection and options ---
+
+
+def test_collects_scenarios_longest_first(scenario_project):
+    result = scenario_project.runpytest(*PLUGIN, "--collect-only", "-q")
+
+    result.assert_outcomes()
+    assert collected_names(result) == ["a", "b", "c", "d", "e"]
+
+
+def test_collects_single_scenario_object(pytester):
+    pytester.makefile(".parasight.json", login=json.dumps({"prompt": "Test the login flow"}))
+
+    result = pytester.runpytest(*PLUGIN, "--collect-only", "-q")
+
+    assert collected_names(result) == ["scenario_0"]
+
+
+def test_scenario_without_prompt_is_a_collection_error(pytester):
+    pytester.makefile(".parasight.json", broken=json.dumps([{"name": "no_prompt"}]))
+
+    result = pytester.runpytest(*PLUGIN, "--collect-only", "-q")
+
+    assert result.ret == pytest.ExitCode.INTERRUPTED
+    result.stdout.fnmatch_lines(["*Scenario 0 in *broken.parasight.json must be an object with a 'prompt'*"])
+
+
+def test_plugin_is_not_loaded_without_opt_in(scenario_project):
+    result = scenario_project.runpytest("--collect-only", "-q")
+
+    assert collected_names(result) == []
+
+
+def test_shards_cover_every_scenario_exactly_once(scenario_project):
+    shards = []
+    for index in range(2):
+        result = scenario_project.runpytest(
+            *PLUGIN, "--collect-only", "-q", "--parasight-shard-count", "2", f"--parasight-shard-index={index}"
+        )
+        shards.append(collected_names(result))
+
+    assert shards == [["a", "d", "e"], ["b", "c"]]
+
+
+def test_scenarios_without_durations_get_a_shard(scenario_project):
+    (scenario_project.path / ".parasight_durations.json").unlink()
+
+    shards = []
+    for index in range(2):
+        result = scenario_project.runpytest(
+            *PLUGIN, "--collect-only", "-q", "--parasight-shard-count", "2", f"--parasight-shard-index={index}"
+        )
+        shards.append(collected_names(result))
+
+    assert sorted(shards[0] + shards[1]) == sorted(SCENARIOS)
+    assert all(shards)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        ["--parasight-shard-count", "0"],
+        ["--parasight-shard-count", "2", "--parasight-shard-index", "2"],
+        ["--parasight-shard-index", "-1"],
+        ["--parasight-browsers", "0"],
+    ],
+)
+def test_invalid_options_are_usage_errors(pytester, options):
+    result = pytester.runpytest(*PLUGIN, *options)
+
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+
+
+# --- running scenarios ---
+
+# Replaces the agent, the OpenAI runner and the browser launch, so scenarios run without a browser or network.
+# The stub agent answers with the scenario's prompt, or raises when the prompt is "crash".
+STUB_CONFTEST = """
+import asyncio
+import os
+import sys
+import types
+from pathlib import Path
+
+import agents
+
+from parasight.helpers.browser_pool import BrowserPool
+from parasight.helpers.stage_timer import stage_timer
+
+STARTS_LOG = Path(__file__).parent / "starts.log"
+
+agents.set_tracing_disabled(True)
+
+main = types.ModuleType("parasight.main")
+main.agent = object()
+sys.modules["parasight.main"] = main
+
+
+async def run(agent, prompt):
+    with stage_timer("screenshot"):
+        await asyncio.sleep(0.01)
+    if prompt == "crash":
+        raise RuntimeError("OmniParser is down")
+    return types.SimpleNamespace(final_output=prompt)
+
+
+async def start(self):
+    with STARTS_LOG.open("a") as log:
+        log.write(f"{os.getpid()}\\n")
+    if os.getenv("PARASIGHT_STUB_FAIL_START"):
+        raise RuntimeError("Chromium failed to launch")
+
+
+async def close(self):
+    pass
+
+
+agents.Runner.run = staticmethod(run)
+BrowserPool.start = start
+BrowserPool.close = close
+"""
+
+
+def junit_stage_timings(path):
+    properties = {}
+    for testcase in ElementTree.parse(path).iter("testcase"):
+        for prop in testcase.iter("property"):
+            if prop.get("name") == STAGE_TIMINGS_PROPERTY:
+                properties[testcase.get("name")] = prop.get("value")
+    return properties
+
+
+@pytest.fixture
+def stubbed_project(pytester):
+    pytester.makeconftest(STUB_CONFTEST)
+    return pytester
+
+
+def test_scenario_run_reports_stage_timings_and_answers(stubbed_project):
+    stubbed_project.makefile(
+        ".parasight.json",
+        suite=json.dumps([
+            {"name": "passes", "prompt": "PASS"},
+            {"name": "wrong_answer", "prompt": "FAIL"},
+            {"name": "crashes", "prompt": "crash"},
+        ]),
+    )
+    durations_path = stubbed_project.path / ".parasight_durations.json"
+    durations_path.write_text(json.dumps({"suite.parasight.json::crashes": 300.0}))
+
+    result = stubbed_project.runpytest_subprocess(*PLUGIN, "-rA", "--junitxml=report.xml")
+
+    result.assert_outcomes(passed=1, failed=2)
+    result.stdout.fnmatch_lines(["*wrong_answer: Expected 'PASS', agent answered 'FAIL'*"])
+    result.stdout.fnmatch_lines(["*RuntimeError: OmniParser is down*"])
+    assert result.stdout.str().count("Captured parasight stage timings call") == 3
+    result.stdout.fnmatch_lines(["screenshot *s  (1 call(s))"])
+
+    timings = junit_stage_timings(stubbed_project.path / "report.xml")
+    assert sorted(timings) == ["crashes", "passes", "wrong_answer"]
+    assert all("screenshot" in value for value in timings.values())
+
+    durations = json.loads(durations_path.read_text())
+    assert sorted(durations) == [
+        "suite.parasight.json::crashes",
+        "suite.parasight.json::passes",
+        "suite.parasight.json::wrong_answer",
+    ]
+    assert durations["suite.parasight.json::crashes"] == 300.0
+    assert (stubbed_project.path / "starts.log").read_text().count("\n") == 1
+
+
+def test_failed_start_fails_later_scenarios_without_relaunching(stubbed_project, monkeypatch):
+    monkeypatch.setenv("PARASIGHT_STUB_FAIL_START", "1")
+    stubbed_project.makefile(
+        ".parasight.json",
+        suite=json.dumps([{"name": "first", "prompt": "PASS"}, {"name": "second", "prompt": "PASS"}]),
+    )
+
+    result = stubbed_project.runpytest_subprocess(*PLUGIN, "-rE")
+
+    result.assert_outcomes(errors=2)
+    result.stdout.fnmatch_lines([
+        "ERROR *::first - RuntimeError: Chromium failed to launch",
+        "ERROR *::second - RuntimeError: Parasight worker resources*",
+    ])
+    assert (stubbed_project.path / "starts.log").read_text().count("\n") == 1
+    assert not (stubbed_project.path / ".parasight_durations.json").exists()
+
+
+def test_xdist_workers_report_timings_and_controller_saves_durations(stubbed_project):
+    names = [f"scenario_{index}" for index in range(4)]
+    stubbed_project.makefile(".parasight.json", suite=json.dumps([{"name": name, "prompt": "PASS"} for name in names]))
+
+    result = stubbed_project.runpytest_subprocess(*PLUGIN, "-p", "xdist", "-n", "2", "--junitxml=report.xml")
+
+    result.assert_outcomes(passed=4)
+    timings = junit_stage_timings(stubbed_project.path / "report.xml")
+    assert sorted(timings) == names
+    assert all("screenshot" in value for value in timings.values())
+
+    durations = json.loads((stubbed_project.path / ".parasight_durations.json").read_text())
+    assert sorted(durations) == [f"suite.parasight.json::{name}" for name in names]
+    # Each worker process starts its own resources once
+    starts = (stubbed_project.path / "starts.log").read_text().split()
+    assert len(starts) == len(set(starts)) == 2
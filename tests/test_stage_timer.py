@@ -0,0 +1,71 @@
+import pytest
+
+from parasight.helpers.stage_timer import StageTimings, current_stage_timings, stage_timer
+
+
+def test_add_accumulates_seconds_and_calls():
+    timings = StageTimings()
+    timings.add("screenshot", 1.0)
+    timings.add("screenshot", 0.5)
+    timings.add("omniparser", 2.0)
+
+    assert timings.as_dict() == {
+        "screenshot": {"seconds": 1.5, "calls": 2},
+        "omniparser": {"seconds": 2.0, "calls": 1},
+    }
+
+
+def test_as_dict_rounds_to_milliseconds():
+    timings = StageTimings()
+    timings.add("total", 1.23456)
+
+    assert timings.as_dict() == {"total": {"seconds": 1.235, "calls": 1}}
+
+
+def test_format_lists_slowest_stage_first():
+    timings = StageTimings()
+    timings.add("screenshot", 1.0)
+    timings.add("total", 10.0)
+    timings.add("omniparser", 4.0)
+
+    lines = timings.format().splitlines()
+
+    assert [line.split()[0] for line in lines] == ["total", "omniparser", "screenshot"]
+    assert lines[0] == "total         10.000s  (1 call(s))"
+
+
+def test_format_without_stages():
+    assert StageTimings().format() == "no stages recorded"
+
+
+def test_stage_timer_records_into_current_timings():
+    timings = StageTimings()
+    token = current_stage_timings.set(timings)
+    try:
+        with stage_timer("screenshot"):
+            pass
+    finally:
+        current_stage_timings.reset(token)
+
+    assert timings.calls == {"screenshot": 1}
+    assert timings.seconds["screenshot"] >= 0
+
+
+def test_stage_timer_records_when_the_block_raises():
+    timings = StageTimings()
+    token = current_stage_timings.set(timings)
+    try:
+        with pytest.raises(RuntimeError):
+            with stage_timer("interaction"):
+                raise RuntimeError("boom")
+    finally:
+        current_stage_timings.reset(token)
+
+    assert timings.calls == {"interaction": 1}
+
+
+def test_stage_timer_without_current_timings_is_a_no_op():
+    with stage_timer("screenshot"):
+        pass
+
+    assert current_stage_timings.get() is None